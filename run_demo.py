@@ -8,12 +8,14 @@ import os
 import sys
 import json
 import time
+import queue
+import threading
 import cv2
 import numpy as np
 from loguru import logger
 from src.face_pipeline import FacePipeline
 from src.logger import setup_logger
-from src.utils import create_directories
+from src.utils import create_directories, LatestFrameBuffer
 
 def create_sample_video(output_path="data/sample_demo.mp4", duration=10, fps=30):
     """
@@ -26,36 +28,44 @@ def create_sample_video(output_path="data/sample_demo.mp4", duration=10, fps=30)
         out = cv2.VideoWriter(output_path, fourcc, fps, (width, height))
         
         logger.info(f"Creating sample video: {output_path}")
-        
-        for frame_num in range(duration * fps):
-            # Create frame
-            frame = np.ones((height, width, 3), dtype=np.uint8) * 128
-            
-            # Add moving rectangles to simulate faces
-            t = frame_num / fps
-            
+
+        total_frames = duration * fps
+
+        # Precompute the constant background and all trajectories outside the
+        # loop; per-frame work is then a memcpy plus a few small draw calls
+        base = np.full((height, width, 3), 128, dtype=np.uint8)
+        t_arr = np.arange(total_frames) / fps
+        # .tolist() yields plain Python ints, so the draw calls below never
+        # pay a per-frame numpy-scalar conversion
+        x1_arr = (50 + 200 * np.sin(t_arr)).astype(np.int32).tolist()
+        y2_arr = (50 + 150 * np.cos(t_arr * 0.5)).astype(np.int32).tolist()
+        x3_arr = (400 + 100 * np.sin(t_arr * 2)).astype(np.int32).tolist()
+
+        timestamp_text = ""
+        for frame_num in range(total_frames):
+            frame = base.copy()
+
             # Face 1 - moving from left to right
-            x1 = int(50 + 200 * np.sin(t))
-            y1 = 100
+            x1, y1 = x1_arr[frame_num], 100
             cv2.rectangle(frame, (x1, y1), (x1 + 80, y1 + 80), (0, 255, 0), -1)
             cv2.putText(frame, "Face 1", (x1, y1 - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
-            
+
             # Face 2 - moving from top to bottom
-            x2 = 300
-            y2 = int(50 + 150 * np.cos(t * 0.5))
+            x2, y2 = 300, y2_arr[frame_num]
             cv2.rectangle(frame, (x2, y2), (x2 + 80, y2 + 80), (255, 0, 0), -1)
             cv2.putText(frame, "Face 2", (x2, y2 - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
-            
+
             # Face 3 - appears later
             if frame_num > fps * 5:
-                x3 = int(400 + 100 * np.sin(t * 2))
-                y3 = 300
+                x3, y3 = x3_arr[frame_num], 300
                 cv2.rectangle(frame, (x3, y3), (x3 + 80, y3 + 80), (0, 0, 255), -1)
                 cv2.putText(frame, "Face 3", (x3, y3 - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
-            
-            # Add timestamp
-            cv2.putText(frame, f"Time: {t:.1f}s", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
-            
+
+            # Add timestamp (string only changes once per second)
+            if frame_num % fps == 0:
+                timestamp_text = f"Time: {t_arr[frame_num]:.1f}s"
+            cv2.putText(frame, timestamp_text, (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+
             out.write(frame)
         
         out.release()
@@ -66,6 +76,41 @@ def create_sample_video(output_path="data/sample_demo.mp4", duration=10, fps=30)
         logger.error(f"Error creating sample video: {e}")
         return None
 
+def _frame_reader(cap, read_q, stop_event):
+    """
+    Producer thread: decode frames off the processing thread
+    """
+    while not stop_event.is_set():
+        ret, frame = cap.read()
+        if not ret:
+            break
+        read_q.put(frame)
+    read_q.put(None)  # EOF sentinel
+
+def _frame_display(display_q, stop_event):
+    """
+    Display thread: imshow + key handling off the processing thread
+    """
+    while True:
+        frame = display_q.get()
+        if frame is None:
+            break
+
+        cv2.imshow('Face Tracker Demo', frame)
+
+        # Handle key presses
+        key = cv2.waitKey(1) & 0xFF
+        if key == ord('q'):
+            logger.info("Demo stopped by user")
+            stop_event.set()
+        elif key == ord('s'):
+            # Save snapshot
+            timestamp = time.strftime("%Y%m%d_%H%M%S")
+            cv2.imwrite(f"demo_snapshot_{timestamp}.jpg", frame)
+            logger.info(f"Snapshot saved: demo_snapshot_{timestamp}.jpg")
+
+    cv2.destroyAllWindows()
+
 def run_demo():
     """
     Run the complete demo
@@ -118,40 +163,54 @@ def run_demo():
         
         frame_count = 0
         start_time = time.time()
-        
-        while True:
-            ret, frame = cap.read()
-            if not ret:
+
+        # Decode and display run on their own threads with bounded queues so
+        # I/O overlaps processing; the pipeline itself stays single-threaded
+        # and needs no locks around tracker/recognizer state. Live cameras
+        # get a LIFO buffer so lag never accumulates behind the pipeline.
+        if isinstance(video_path, int):
+            read_q = LatestFrameBuffer(maxlen=2)
+        else:
+            read_q = queue.Queue(maxsize=8)
+        display_q = queue.Queue(maxsize=8)
+        stop_event = threading.Event()
+
+        reader = threading.Thread(target=_frame_reader, args=(cap, read_q, stop_event), daemon=True)
+        display = threading.Thread(target=_frame_display, args=(display_q, stop_event), daemon=True)
+        reader.start()
+        display.start()
+
+        while not stop_event.is_set():
+            frame = read_q.get()
+            if frame is None:
                 break
-            
+
             frame_count += 1
-            
+
             # Process frame
             processed_frame = pipeline.process_frame(frame)
-            
-            # Display frame
-            cv2.imshow('Face Tracker Demo', processed_frame)
-            
-            # Handle key presses
-            key = cv2.waitKey(30) & 0xFF  # 30ms delay for ~30 FPS display
-            if key == ord('q'):
-                logger.info("Demo stopped by user")
-                break
-            elif key == ord('s'):
-                # Save snapshot
-                timestamp = time.strftime("%Y%m%d_%H%M%S")
-                cv2.imwrite(f"demo_snapshot_{timestamp}.jpg", processed_frame)
-                logger.info(f"Snapshot saved: demo_snapshot_{timestamp}.jpg")
-            
+            display_q.put(processed_frame)
+
             # Show progress
             if frame_count % 30 == 0:
                 elapsed = time.time() - start_time
                 progress = (frame_count / total_frames) * 100
                 logger.info(f"Progress: {progress:.1f}% ({frame_count}/{total_frames}) - FPS: {frame_count/elapsed:.1f}")
-        
-        # Cleanup
+
+        # Cleanup: the reader may be blocked in read_q.put() when the user
+        # quits, so drain the queue while joining it — releasing cap while
+        # cap.read() still runs on the reader thread is undefined
+        stop_event.set()
+        while reader.is_alive():
+            if isinstance(read_q, queue.Queue):
+                try:
+                    read_q.get_nowait()
+                except queue.Empty:
+                    pass
+            reader.join(timeout=0.1)
+        display_q.put(None)
+        display.join()
         cap.release()
-        cv2.destroyAllWindows()
         
         # Final statistics
         total_time = time.time() - start_time
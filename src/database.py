@@ -1,6 +1,7 @@
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, Text
+from sqlalchemy import create_engine, event, bindparam, select, func, Index, Column, Integer, String, DateTime, Text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 import datetime
 from loguru import logger
 import os
@@ -23,8 +24,13 @@ class Event(Base):
     timestamp = Column(DateTime, default=datetime.datetime.utcnow)
     image_path = Column(Text, nullable=True)
     confidence = Column(String(50), nullable=True)
+    # Composite index keeps per-visitor event lookups O(log N) as the log grows
+    __table_args__ = (Index('ix_events_face_ts', 'face_id', 'timestamp'),)
 
 class Database:
+    # Flush buffered writes to SQLite after this many pending events
+    FLUSH_EVERY = 100
+
     def __init__(self, db_path):
         """
         Initialize database connection
@@ -34,15 +40,56 @@ class Database:
         try:
             # Ensure database directory exists
             os.makedirs(os.path.dirname(db_path), exist_ok=True)
-            
-            self.engine = create_engine(f'sqlite:///{db_path}')
+
+            # StaticPool shares one connection across threads (the detection
+            # worker logs events too) instead of reopening the file per use
+            self.engine = create_engine(
+                f'sqlite:///{db_path}',
+                connect_args={'check_same_thread': False},
+                poolclass=StaticPool
+            )
+            event.listen(self.engine, 'connect', self._set_sqlite_pragmas)
             Base.metadata.create_all(self.engine)
             self.Session = sessionmaker(bind=self.engine)
+
+            # One long-lived session for the hot write path; per-call
+            # sessions churned a transaction + fsync per row
+            self.session = self.Session()
+
+            # Buffered writes: events are queued and visitor "last seen"
+            # touches are coalesced, then flushed in bulk
+            self._event_buffer = []
+            self._visitor_touches = {}  # {face_id: (last_seen, touch_count)}
+
+            # Visitor count cached in memory; it only changes on add_visitor,
+            # so the overlay never needs a per-frame COUNT(*) round-trip
+            self._visitor_count = self.session.execute(
+                select(func.count()).select_from(Visitor)
+            ).scalar() or 0
+
+            # Known face_ids cached in memory: once a face is known it stays
+            # known for the whole session, so repeat existence checks (the
+            # dominant case on a long-running stream) never hit SQLite
+            self._known_ids = set(
+                row[0] for row in self.session.execute(select(Visitor.face_id))
+            )
+
             logger.info(f"Database initialized at {db_path}")
         except Exception as e:
             logger.error(f"Failed to initialize database: {e}")
             raise
 
+    @staticmethod
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        """
+        Configure SQLite for concurrent readers and cheaper commits
+        """
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.close()
+
     def add_visitor(self, face_id):
         """
         Add a new visitor to the database
@@ -52,17 +99,40 @@ class Database:
             True if successful, False otherwise
         """
         try:
-            session = self.Session()
             visitor = Visitor(face_id=face_id)
-            session.add(visitor)
-            session.commit()
-            session.close()
+            self.session.add(visitor)
+            self.session.commit()
+            self._visitor_count += 1
+            self._known_ids.add(face_id)
             logger.info(f"Added new visitor: {face_id}")
             return True
         except Exception as e:
             logger.error(f"Error adding visitor {face_id}: {e}")
-            session.rollback()
-            session.close()
+            self.session.rollback()
+            return False
+
+    def add_visitors(self, face_ids):
+        """
+        Add several visitors in one executemany insert and one commit,
+        instead of a transaction (and fsync) per visitor
+        Args:
+            face_ids: Iterable of unique face identifiers
+        Returns:
+            True if successful, False otherwise
+        """
+        rows = [{'face_id': fid} for fid in face_ids]
+        if not rows:
+            return True
+        try:
+            self.session.execute(Visitor.__table__.insert(), rows)
+            self.session.commit()
+            self._visitor_count += len(rows)
+            self._known_ids.update(row['face_id'] for row in rows)
+            logger.info(f"Added {len(rows)} new visitors")
+            return True
+        except Exception as e:
+            logger.error(f"Error adding visitors: {e}")
+            self.session.rollback()
             return False
 
     def update_visitor_last_seen(self, face_id):
@@ -74,21 +144,13 @@ class Database:
             True if successful, False otherwise
         """
         try:
-            session = self.Session()
-            visitor = session.query(Visitor).filter_by(face_id=face_id).first()
-            if visitor:
-                visitor.last_seen = datetime.datetime.utcnow()
-                visitor.total_visits += 1
-                session.commit()
-                session.close()
-                return True
-            else:
-                session.close()
-                return False
+            # Coalesce per-frame touches in memory; flush() writes a single
+            # UPDATE per face instead of one transaction per frame
+            last_seen, touch_count = self._visitor_touches.get(face_id, (None, 0))
+            self._visitor_touches[face_id] = (datetime.datetime.utcnow(), touch_count + 1)
+            return True
         except Exception as e:
             logger.error(f"Error updating visitor {face_id}: {e}")
-            session.rollback()
-            session.close()
             return False
 
     def log_event(self, face_id, event_type, image_path=None, confidence=None):
@@ -103,22 +165,51 @@ class Database:
             True if successful, False otherwise
         """
         try:
-            session = self.Session()
-            event = Event(
-                face_id=face_id,
-                event_type=event_type,
-                image_path=image_path,
-                confidence=str(confidence) if confidence else None
-            )
-            session.add(event)
-            session.commit()
-            session.close()
+            self._event_buffer.append({
+                'face_id': face_id,
+                'event_type': event_type,
+                'timestamp': datetime.datetime.utcnow(),
+                'image_path': image_path,
+                'confidence': str(confidence) if confidence else None
+            })
             logger.info(f"Logged {event_type} event for face {face_id}")
+            if len(self._event_buffer) >= self.FLUSH_EVERY:
+                self.flush()
             return True
         except Exception as e:
             logger.error(f"Error logging event for {face_id}: {e}")
-            session.rollback()
-            session.close()
+            return False
+
+    def flush(self):
+        """
+        Flush buffered events and visitor touches to SQLite in bulk
+        Returns:
+            True if successful, False otherwise
+        """
+        if not self._event_buffer and not self._visitor_touches:
+            return True
+        try:
+            if self._event_buffer:
+                self.session.execute(Event.__table__.insert(), self._event_buffer)
+                self._event_buffer = []
+            if self._visitor_touches:
+                table = Visitor.__table__
+                self.session.execute(
+                    table.update()
+                    .where(table.c.face_id == bindparam('fid'))
+                    .values(last_seen=bindparam('ts'),
+                            total_visits=table.c.total_visits + bindparam('visits')),
+                    [
+                        {'fid': face_id, 'ts': last_seen, 'visits': touch_count}
+                        for face_id, (last_seen, touch_count) in self._visitor_touches.items()
+                    ]
+                )
+                self._visitor_touches = {}
+            self.session.commit()
+            return True
+        except Exception as e:
+            logger.error(f"Error flushing buffered writes: {e}")
+            self.session.rollback()
             return False
 
     def get_unique_visitor_count(self):
@@ -128,8 +219,9 @@ class Database:
             Number of unique visitors
         """
         try:
+            self.flush()
             session = self.Session()
-            count = session.query(Visitor).count()
+            count = session.execute(select(func.count()).select_from(Visitor)).scalar()
             session.close()
             return count
         except Exception as e:
@@ -137,6 +229,14 @@ class Database:
             session.close()
             return 0
 
+    def get_unique_visitor_count_cached(self):
+        """
+        Get the in-memory visitor count without touching SQLite
+        Returns:
+            Number of unique visitors
+        """
+        return self._visitor_count
+
     def get_visitor_events(self, face_id):
         """
         Get all events for a specific visitor
@@ -146,6 +246,7 @@ class Database:
             List of events
         """
         try:
+            self.flush()
             session = self.Session()
             events = session.query(Event).filter_by(face_id=face_id).order_by(Event.timestamp).all()
             session.close()
@@ -164,6 +265,7 @@ class Database:
             List of recent events
         """
         try:
+            self.flush()
             session = self.Session()
             events = session.query(Event).order_by(Event.timestamp.desc()).limit(limit).all()
             session.close()
@@ -173,6 +275,55 @@ class Database:
             session.close()
             return []
 
+    def get_recent_event_rows(self, limit=100):
+        """
+        Get recent events as plain column tuples, skipping ORM hydration
+        (the web API only re-serializes the fields, so mapped objects,
+        identity-map bookkeeping and lazy attributes are wasted work)
+        Args:
+            limit: Maximum number of events to return
+        Returns:
+            List of (id, face_id, event_type, timestamp, image_path, confidence) tuples
+        """
+        try:
+            self.flush()
+            session = self.Session()
+            rows = session.execute(
+                select(Event.id, Event.face_id, Event.event_type,
+                       Event.timestamp, Event.image_path, Event.confidence)
+                .order_by(Event.timestamp.desc()).limit(limit)
+            ).all()
+            session.close()
+            return rows
+        except Exception as e:
+            logger.error(f"Error getting recent events: {e}")
+            session.close()
+            return []
+
+    def get_visitor_event_rows(self, face_id):
+        """
+        Get a visitor's events as plain column tuples (see get_recent_event_rows)
+        Args:
+            face_id: Face identifier
+        Returns:
+            List of (id, face_id, event_type, timestamp, image_path, confidence) tuples
+        """
+        try:
+            self.flush()
+            session = self.Session()
+            rows = session.execute(
+                select(Event.id, Event.face_id, Event.event_type,
+                       Event.timestamp, Event.image_path, Event.confidence)
+                .where(Event.face_id == face_id)
+                .order_by(Event.timestamp)
+            ).all()
+            session.close()
+            return rows
+        except Exception as e:
+            logger.error(f"Error getting events for {face_id}: {e}")
+            session.close()
+            return []
+
     def visitor_exists(self, face_id):
         """
         Check if a visitor exists in the database
@@ -182,10 +333,20 @@ class Database:
             True if visitor exists, False otherwise
         """
         try:
+            # Hot path: hit the in-memory cache before touching SQLite
+            if face_id in self._known_ids:
+                return True
+
+            self.flush()
             session = self.Session()
-            visitor = session.query(Visitor).filter_by(face_id=face_id).first()
+            # Core-level EXISTS: no ORM row hydration or identity-map work
+            found = session.execute(
+                select(select(Visitor.id).where(Visitor.face_id == face_id).exists())
+            ).scalar()
             session.close()
-            return visitor is not None
+            if found:
+                self._known_ids.add(face_id)
+            return bool(found)
         except Exception as e:
             logger.error(f"Error checking visitor existence: {e}")
             session.close()
@@ -198,18 +359,22 @@ class Database:
             Dictionary with visitor statistics
         """
         try:
+            self.flush()
             session = self.Session()
-            total_visitors = session.query(Visitor).count()
-            total_events = session.query(Event).count()
-            entry_events = session.query(Event).filter_by(event_type='entry').count()
-            exit_events = session.query(Event).filter_by(event_type='exit').count()
+            # One grouped scan of events instead of three separate COUNT(*)
+            event_counts = dict(session.execute(
+                select(Event.event_type, func.count()).group_by(Event.event_type)
+            ).all())
+            total_visitors = session.execute(
+                select(func.count()).select_from(Visitor)
+            ).scalar()
             session.close()
-            
+
             return {
                 'total_visitors': total_visitors,
-                'total_events': total_events,
-                'entry_events': entry_events,
-                'exit_events': exit_events
+                'total_events': sum(event_counts.values()),
+                'entry_events': event_counts.get('entry', 0),
+                'exit_events': event_counts.get('exit', 0)
             }
         except Exception as e:
             logger.error(f"Error getting visitor stats: {e}")
@@ -221,6 +386,8 @@ class Database:
         Close database connection
         """
         try:
+            self.flush()
+            self.session.close()
             self.engine.dispose()
             logger.info("Database connection closed")
         except Exception as e:
@@ -1,12 +1,15 @@
 import cv2
 import numpy as np
+import queue
+import threading
 import time
+from datetime import datetime
 from loguru import logger
 from .face_detection import FaceDetector
 from .face_recognition import FaceRecognizer
 from .tracker import FaceTracker
 from .database import Database
-from .utils import save_cropped_face, draw_bbox, calculate_iou, get_timestamp
+from .utils import save_cropped_face, draw_bbox, get_timestamp, calculate_iou_batch
 
 class FacePipeline:
     def __init__(self, config):
@@ -17,20 +20,150 @@ class FacePipeline:
         """
         self.config = config
         self.frame_count = 0
-        self.detection_skip_frames = config.get('detection_skip_frames', 5)
-        
+
         # Initialize components
         self.detector = FaceDetector()
         self.recognizer = FaceRecognizer()
         self.tracker = FaceTracker()
         self.database = Database(config['database_path'])
-        
-        # State tracking
-        self.current_faces = {}  # {face_id: {'bbox': bbox, 'last_seen': timestamp}}
+
+        # State tracking for faces currently in frame, stored as parallel
+        # struct-of-arrays: exit checks and annotation walk contiguous
+        # arrays instead of chasing per-face dicts
+        capacity = 16
+        self._face_bboxes = np.zeros((capacity, 4), dtype=np.int32)
+        self._face_last_seen = np.zeros(capacity, dtype=np.float64)
+        self._face_ids = [None] * capacity
+        self._face_tracker_ids = [None] * capacity
+        self._face_slots = {}  # {face_id: row index}
+        self._face_count = 0
         self.face_history = {}   # Track face movements for exit detection
-        
+
+        # Detection runs on a worker thread fed through single-slot queues,
+        # so the main loop never stalls on a YOLO forward pass; the worker
+        # always sees the most recent frame the pipeline handed it
+        self._detect_in = queue.Queue(maxsize=1)
+        self._detect_out = queue.Queue(maxsize=1)
+        self._detect_thread = threading.Thread(target=self._detection_worker, daemon=True)
+        self._detect_thread.start()
+
+        # Callbacks invoked with each entry/exit event dict; lets the web
+        # layer push events to clients instead of re-polling the database
+        self._event_listeners = []
+
         logger.info("Face pipeline initialized successfully")
 
+    def on_event(self, callback):
+        """
+        Register a callback invoked with every entry/exit event dict
+        Args:
+            callback: Callable taking one event dict
+        """
+        self._event_listeners.append(callback)
+
+    def _notify_event(self, face_id, event_type, image_path, confidence=None):
+        """
+        Fan an event out to registered listeners (errors never propagate
+        back into the frame loop)
+        """
+        if not self._event_listeners:
+            return
+        event = {
+            'face_id': face_id,
+            'event_type': event_type,
+            'timestamp': datetime.now().isoformat(),
+            'image_path': image_path,
+            'confidence': confidence
+        }
+        for callback in self._event_listeners:
+            try:
+                callback(event)
+            except Exception as e:
+                logger.error(f"Error in event listener: {e}")
+
+    def _face_add(self, face_id, bbox, tracker_id=None):
+        """
+        Add a face to the current-faces arrays, or refresh its existing
+        row if it is already present
+        """
+        row = self._face_slots.get(face_id)
+        if row is not None:
+            # Already in frame: a drifted tracker can miss the IoU match
+            # while recognition still returns the known id. Update the row
+            # in place — appending a duplicate would orphan this one, and
+            # the orphan would re-fire its exit event every frame forever
+            self._face_bboxes[row] = bbox[:4]
+            self._face_last_seen[row] = time.time()
+            self._face_tracker_ids[row] = tracker_id
+            return
+
+        if self._face_count == self._face_bboxes.shape[0]:
+            # Double capacity so appends stay amortized O(1)
+            new_capacity = self._face_bboxes.shape[0] * 2
+            bboxes = np.zeros((new_capacity, 4), dtype=np.int32)
+            last_seen = np.zeros(new_capacity, dtype=np.float64)
+            bboxes[:self._face_count] = self._face_bboxes
+            last_seen[:self._face_count] = self._face_last_seen
+            self._face_bboxes = bboxes
+            self._face_last_seen = last_seen
+            self._face_ids.extend([None] * (new_capacity - len(self._face_ids)))
+            self._face_tracker_ids.extend([None] * (new_capacity - len(self._face_tracker_ids)))
+
+        row = self._face_count
+        self._face_bboxes[row] = bbox[:4]
+        self._face_last_seen[row] = time.time()
+        self._face_ids[row] = face_id
+        self._face_tracker_ids[row] = tracker_id
+        self._face_slots[face_id] = row
+        self._face_count += 1
+
+    def _face_touch(self, face_id, bbox=None):
+        """
+        Refresh a face's last-seen time and optionally its bounding box
+        """
+        row = self._face_slots.get(face_id)
+        if row is None:
+            return
+        if bbox is not None:
+            self._face_bboxes[row] = bbox[:4]
+        self._face_last_seen[row] = time.time()
+
+    def _face_remove(self, face_id):
+        """
+        Remove a face, keeping the arrays contiguous by swapping in the last row
+        """
+        row = self._face_slots.pop(face_id, None)
+        if row is None:
+            return
+        last = self._face_count - 1
+        if row != last:
+            self._face_bboxes[row] = self._face_bboxes[last]
+            self._face_last_seen[row] = self._face_last_seen[last]
+            moved_id = self._face_ids[last]
+            self._face_ids[row] = moved_id
+            self._face_tracker_ids[row] = self._face_tracker_ids[last]
+            self._face_slots[moved_id] = row
+        self._face_ids[last] = None
+        self._face_tracker_ids[last] = None
+        self._face_count -= 1
+
+    def _detection_worker(self):
+        """
+        Worker thread: run face detection on frames from the input slot
+        """
+        while True:
+            frame = self._detect_in.get()
+            if frame is None:
+                break
+            try:
+                detections = self.detector.detect_faces(frame)
+                try:
+                    self._detect_out.put_nowait(detections)
+                except queue.Full:
+                    pass  # Previous result not consumed yet; drop this one
+            except Exception as e:
+                logger.error(f"Error in detection worker: {e}")
+
     def process_frame(self, frame):
         """
         Process a single frame through the complete pipeline
@@ -40,17 +173,31 @@ class FacePipeline:
             Processed frame with annotations
         """
         self.frame_count += 1
-        processed_frame = frame.copy()
-        
+        # Annotate the input buffer in place; copying the full frame cost a
+        # ~1MB memcpy per frame and no caller reuses the original pixels
+        processed_frame = frame
+
         try:
             # Update trackers
             tracked_faces = self.tracker.update(frame)
-            
-            # Run detection every N frames
-            if self.frame_count % self.detection_skip_frames == 0:
-                detected_faces = self.detector.detect_faces(frame)
+
+            # Hand the detector a frame whenever it is idle (copy: the main
+            # thread annotates frames in place), and fold in any finished
+            # detections without blocking
+            if self._detect_in.empty():
+                try:
+                    self._detect_in.put_nowait(frame.copy())
+                except queue.Full:
+                    pass
+            try:
+                detected_faces = self._detect_out.get_nowait()
+            except queue.Empty:
+                detected_faces = None
+
+            if detected_faces:
                 self._process_detections(frame, detected_faces, tracked_faces)
-            
+
+
             # Process tracked faces
             self._process_tracked_faces(frame, tracked_faces)
             
@@ -69,34 +216,61 @@ class FacePipeline:
         """
         Process detected faces and match with tracked faces
         """
-        for bbox in detected_faces:
-            x1, y1, x2, y2, confidence = bbox
-            
-            # Check if this detection matches any tracked face
-            matched_tracker = self._match_detection_to_tracker(bbox, tracked_faces)
-            
-            if matched_tracker is None:
-                # New face detected
-                self._process_new_face(frame, bbox, confidence)
-            else:
-                # Update existing tracker
-                self._update_tracker(matched_tracker, bbox)
+        if not detected_faces:
+            return
+
+        if not tracked_faces:
+            new_faces = list(detected_faces)
+        else:
+            # Match all detections against all trackers with one broadcast
+            # IoU instead of a Python loop per pair
+            detection_boxes = np.asarray([b[:4] for b in detected_faces], dtype=np.float32)
+            tracker_boxes = np.asarray([t['bbox'][:4] for t in tracked_faces], dtype=np.float32)
+            iou_matrix = calculate_iou_batch(detection_boxes, tracker_boxes)
+            best_tracker = iou_matrix.argmax(axis=1)
+            best_iou = iou_matrix[np.arange(len(detected_faces)), best_tracker]
 
-    def _process_new_face(self, frame, bbox, confidence):
+            new_faces = []
+            for i, bbox in enumerate(detected_faces):
+                if best_iou[i] > 0.5:  # IoU threshold
+                    # Update existing tracker
+                    self._update_tracker(tracked_faces[best_tracker[i]], bbox)
+                else:
+                    # New face detected
+                    new_faces.append(bbox)
+
+        self._process_new_faces(frame, new_faces)
+
+    def _process_new_faces(self, frame, bboxes):
         """
-        Process a newly detected face
+        Process newly detected faces, embedding all crops in one batch
         """
-        try:
-            # Crop face for recognition
+        crops = []
+        kept_bboxes = []
+        for bbox in bboxes:
             face_img = self.detector.crop_face(frame, bbox)
             if face_img is None or face_img.size == 0:
-                return
-            
-            # Generate embedding
-            embedding = self.recognizer.get_embedding(face_img)
+                continue
+            crops.append(face_img)
+            kept_bboxes.append(bbox)
+
+        if not crops:
+            return
+
+        # One model call for every new face in the frame
+        embeddings = self.recognizer.get_embeddings_batch(crops)
+        for bbox, face_img, embedding in zip(kept_bboxes, crops, embeddings):
+            self._process_new_face(frame, bbox, face_img, embedding)
+
+    def _process_new_face(self, frame, bbox, face_img, embedding):
+        """
+        Process a newly detected face from its pre-computed crop and embedding
+        """
+        try:
+            confidence = bbox[4] if len(bbox) > 4 else None
             if embedding is None:
                 return
-            
+
             # Try to recognize face
             face_id = self.recognizer.recognize_face(embedding)
             
@@ -113,44 +287,21 @@ class FacePipeline:
                 # Log entry event
                 image_path = save_cropped_face(face_img, self.config['log_dir'], face_id, 'entry')
                 self.database.log_event(face_id, 'entry', image_path, confidence)
-                
+                self._notify_event(face_id, 'entry', image_path, confidence)
+
                 # Update current faces
-                self.current_faces[face_id] = {
-                    'bbox': bbox,
-                    'last_seen': time.time(),
-                    'tracker_id': tracker_id
-                }
-                
+                self._face_add(face_id, bbox, tracker_id)
+
                 logger.info(f"New face entered: {face_id}")
             
         except Exception as e:
             logger.error(f"Error processing new face: {e}")
 
-    def _match_detection_to_tracker(self, bbox, tracked_faces):
-        """
-        Match detection to existing tracker using IoU
-        """
-        best_iou = 0.5  # IoU threshold
-        best_match = None
-        
-        for tracked in tracked_faces:
-            tracked_bbox = tracked['bbox']
-            iou = calculate_iou(bbox[:4], tracked_bbox)
-            
-            if iou > best_iou:
-                best_iou = iou
-                best_match = tracked
-        
-        return best_match
-
     def _update_tracker(self, tracked_face, bbox):
         """
         Update existing tracker with new detection
         """
-        face_id = tracked_face['face_id']
-        if face_id in self.current_faces:
-            self.current_faces[face_id]['bbox'] = bbox
-            self.current_faces[face_id]['last_seen'] = time.time()
+        self._face_touch(tracked_face['face_id'], bbox)
 
     def _process_tracked_faces(self, frame, tracked_faces):
         """
@@ -165,11 +316,9 @@ class FacePipeline:
                 
                 # Update database
                 self.database.update_visitor_last_seen(face_id)
-                
+
                 # Update current faces
-                if face_id in self.current_faces:
-                    self.current_faces[face_id]['bbox'] = tracked['bbox']
-                    self.current_faces[face_id]['last_seen'] = time.time()
+                self._face_touch(face_id, tracked['bbox'])
 
     def _check_face_exits(self, frame):
         """
@@ -177,31 +326,39 @@ class FacePipeline:
         """
         current_time = time.time()
         exit_threshold = 2.0  # Seconds without detection
-        
-        for face_id, face_info in list(self.current_faces.items()):
-            if current_time - face_info['last_seen'] > exit_threshold:
-                # Face has exited
-                self._process_face_exit(frame, face_id, face_info)
 
-    def _process_face_exit(self, frame, face_id, face_info):
+        if self._face_count == 0:
+            return
+
+        # One vectorized comparison over the contiguous last-seen array;
+        # expired rows are snapshot first because removal swaps rows around
+        expired_rows = np.nonzero(
+            current_time - self._face_last_seen[:self._face_count] > exit_threshold
+        )[0]
+        expired = [(self._face_ids[i], self._face_bboxes[i].copy()) for i in expired_rows]
+        for face_id, bbox in expired:
+            # Face has exited
+            self._process_face_exit(frame, face_id, bbox)
+
+    def _process_face_exit(self, frame, face_id, bbox):
         """
         Process face exit event
         """
         try:
             # Crop face for exit logging
-            bbox = face_info['bbox']
             face_img = self.detector.crop_face(frame, bbox)
-            
+
             if face_img is not None and face_img.size > 0:
                 # Log exit event
                 image_path = save_cropped_face(face_img, self.config['log_dir'], face_id, 'exit')
                 self.database.log_event(face_id, 'exit', image_path)
-                
+                self._notify_event(face_id, 'exit', image_path)
+
                 logger.info(f"Face exited: {face_id}")
-            
+
             # Remove from current faces
-            del self.current_faces[face_id]
-            
+            self._face_remove(face_id)
+
         except Exception as e:
             logger.error(f"Error processing face exit: {e}")
 
@@ -209,15 +366,15 @@ class FacePipeline:
         """
         Draw bounding boxes and labels on frame
         """
-        # Draw current faces
-        for face_id, face_info in self.current_faces.items():
-            bbox = face_info['bbox']
+        # Draw current faces from the contiguous bbox array
+        for row in range(self._face_count):
+            face_id = self._face_ids[row]
             label = f"ID: {face_id[:8]}"
-            frame = draw_bbox(frame, bbox, label, color=(0, 255, 0))
-        
-        # Draw statistics
-        visitor_count = self.database.get_unique_visitor_count()
-        current_count = len(self.current_faces)
+            frame = draw_bbox(frame, self._face_bboxes[row], label, color=(0, 255, 0))
+
+        # Draw statistics (cached count avoids a SQL query per frame)
+        visitor_count = self.database.get_unique_visitor_count_cached()
+        current_count = self._face_count
         
         # Add text overlay
         cv2.putText(frame, f"Total Visitors: {visitor_count}", (10, 30), 
@@ -232,7 +389,7 @@ class FacePipeline:
         Get current pipeline statistics
         """
         stats = self.database.get_visitor_stats()
-        stats['current_faces'] = len(self.current_faces)
+        stats['current_faces'] = self._face_count
         stats['frame_count'] = self.frame_count
         return stats
 
@@ -241,6 +398,8 @@ class FacePipeline:
         Clean up resources
         """
         try:
+            self._detect_in.put(None)  # Stop the detection worker
+            self._detect_thread.join(timeout=2.0)
             self.database.close()
             logger.info("Face pipeline cleanup completed")
         except Exception as e:
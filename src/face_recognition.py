@@ -1,74 +1,185 @@
+import uuid
 import cv2
-from ultralytics import YOLO
-from deepface import DeepFace
 import numpy as np
+from loguru import logger
 
-# src/face_recognition.py
+try:
+    from deepface import DeepFace
+    DEEPFACE_AVAILABLE = True
+except ImportError:
+    DEEPFACE_AVAILABLE = False
 
 class FaceRecognizer:
-    def __init__(self):
-        # Initialize your model or variables here
-        pass
-
-    def recognize(self, face_image):
-        # Implement recognition logic here
-        # For now, just return a dummy value
-        return "unknown"
-
-# Load YOLOv8 model (replace with 'yolov8n-face.pt' if you have a face-specific model)
-model = YOLO('yolov8n.pt')
-
-# Open video file or webcam
-cap = cv2.VideoCapture(0)  # Change to 0 for webcam
-  # Change to 0 for webcam
-
-known_embeddings = []
-unique_count = 0
-
-while True:
-    ret, frame = cap.read()
-    if not ret:
-        break
-
-    # Run YOLOv8 inference on the frame
-    results = model(frame)
-
-    # Draw bounding boxes
-    for result in results:
-        boxes = result.boxes
-        if boxes is not None:
-            for box in boxes:
-                x1, y1, x2, y2 = map(int, box.xyxy[0])
-                conf = float(box.conf[0])
-                # Optionally, filter by class or confidence
-                if conf > 0.3:
-                    cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
-                    cv2.putText(frame, f"{conf:.2f}", (x1, y1 - 10),
-                                cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
-
-                # Crop the face from the frame
-                face_img = frame[y1:y2, x1:x2]
-
-                # Get embedding
-                embedding = DeepFace.represent(face_img, model_name="Facenet")[0]["embedding"]
-
-                # Compare with known embeddings
-                is_new = True
-                for known in known_embeddings:
-                    dist = np.linalg.norm(np.array(embedding) - np.array(known))
-                    if dist < 10:  # Threshold, tune as needed
-                        is_new = False
-                        break
-
-                if is_new:
-                    known_embeddings.append(embedding)
-                    unique_count += 1
-
-    print("Unique visitors:", unique_count)
-
-    cv2.imshow('YOLOv8 Face Detection', frame)
-    if cv2.waitKey(1) & 0xFF == ord('q'):
-        break
-
-cap.release()
-cv2.destroyAllWindows() 
\ No newline at end of file
+    # Initial capacity of the embedding matrix; grows geometrically
+    INITIAL_CAPACITY = 32
+
+    # Model input size used when stacking crops into a batch
+    INPUT_SIZE = (160, 160)
+
+    # Quantization scale: unit-norm components lie in [-1, 1], so a fixed
+    # factor of 127 maps them onto the full int8 range
+    QUANT_SCALE = 127.0
+
+    def __init__(self, model_name='Facenet', match_threshold=0.8):
+        """
+        Initialize face recognizer with a DeepFace embedding model
+        Args:
+            model_name: DeepFace model to use for embeddings
+            match_threshold: Minimum cosine similarity for a match
+        """
+        self.model_name = model_name
+        self.match_threshold = match_threshold
+
+        # Known embeddings stored L2-normalized and int8-quantized in one
+        # contiguous matrix with geometric growth: matching is a single
+        # integer matrix-vector product, and the gallery takes 4x less
+        # memory than float32 so it stays cache-resident
+        self._matrix = np.empty((self.INITIAL_CAPACITY, 128), dtype=np.int8)
+        self._count = 0
+        self.ids = []
+
+        # Cleared after the first failed batched represent() call, so an
+        # installed deepface without batch support costs one exception
+        # total instead of one per frame
+        self._batch_supported = True
+
+        if not DEEPFACE_AVAILABLE:
+            logger.warning("DeepFace not available - face recognition disabled")
+        else:
+            logger.info(f"Face recognizer initialized with {model_name} model")
+
+    @property
+    def embeddings(self):
+        """
+        View of the registered (normalized, int8-quantized) embeddings
+        """
+        return self._matrix[:self._count]
+
+    @classmethod
+    def _quantize(cls, embedding):
+        """
+        Scale to unit L2 norm, then linearly quantize to int8
+        """
+        embedding = np.asarray(embedding, dtype=np.float32).ravel()
+        norm = np.linalg.norm(embedding)
+        if norm > 0:
+            embedding = embedding / norm
+        return np.clip(np.round(embedding * cls.QUANT_SCALE),
+                       -127, 127).astype(np.int8)
+
+    def get_embedding(self, face_img):
+        """
+        Generate an embedding for a cropped face image
+        Args:
+            face_img: Cropped face image (numpy array)
+        Returns:
+            Embedding vector (float32 numpy array) or None on failure
+        """
+        if not DEEPFACE_AVAILABLE:
+            return None
+        try:
+            result = DeepFace.represent(
+                face_img, model_name=self.model_name, enforce_detection=False
+            )
+            return np.asarray(result[0]['embedding'], dtype=np.float32)
+        except Exception as e:
+            logger.error(f"Error generating embedding: {e}")
+            return None
+
+    def get_embeddings_batch(self, face_imgs):
+        """
+        Generate embeddings for several cropped faces in one model call
+        Args:
+            face_imgs: List of cropped face images (numpy arrays)
+        Returns:
+            List of embedding vectors (None entries for crops that failed)
+        """
+        if not face_imgs or not DEEPFACE_AVAILABLE:
+            return [None] * len(face_imgs)
+        if not self._batch_supported:
+            return [self.get_embedding(img) for img in face_imgs]
+        try:
+            # Stack resized crops so the model runs once over the whole
+            # batch; per-call host overhead dominates at this input size
+            batch = np.stack([cv2.resize(img, self.INPUT_SIZE) for img in face_imgs])
+            results = DeepFace.represent(
+                batch, model_name=self.model_name, enforce_detection=False
+            )
+            # Batched represent (deepface >= 0.0.93, the pinned version)
+            # returns one result list per input image; map per image so
+            # embeddings stay aligned with the crops even when an image
+            # yields zero or several faces
+            if len(results) != len(face_imgs):
+                raise ValueError(
+                    f"batched represent returned {len(results)} results "
+                    f"for {len(face_imgs)} images"
+                )
+            embeddings = []
+            for per_image in results:
+                if isinstance(per_image, dict):
+                    per_image = [per_image]
+                if per_image:
+                    embeddings.append(
+                        np.asarray(per_image[0]['embedding'], dtype=np.float32))
+                else:
+                    embeddings.append(None)
+            return embeddings
+        except Exception as e:
+            logger.error(f"Batched embeddings unavailable, using per-crop calls: {e}")
+            # Fall back to one call per crop so a batching failure does not
+            # drop every face in the frame, and remember not to retry
+            self._batch_supported = False
+            return [self.get_embedding(img) for img in face_imgs]
+
+    def recognize_face(self, embedding):
+        """
+        Match an embedding against known faces
+        Args:
+            embedding: Embedding vector to match
+        Returns:
+            Matched face ID, or None if no known face is similar enough
+        """
+        try:
+            if self._count == 0:
+                return None
+            # int8 gallery x int32 query keeps the accumulate in int32;
+            # dividing by the squared scale recovers cosine similarity
+            query = self._quantize(embedding).astype(np.int32)
+            similarities = (self.embeddings @ query) / (self.QUANT_SCALE ** 2)
+            best = int(similarities.argmax())
+            if similarities[best] > self.match_threshold:
+                return self.ids[best]
+            return None
+        except Exception as e:
+            logger.error(f"Error recognizing face: {e}")
+            return None
+
+    def register_new_face(self, embedding):
+        """
+        Register a new face embedding
+        Args:
+            embedding: Embedding vector for the new face
+        Returns:
+            Newly assigned face ID
+        """
+        face_id = str(uuid.uuid4())
+        quantized = self._quantize(embedding)
+
+        if self._count == 0 and self._matrix.shape[1] != quantized.shape[0]:
+            # First registration fixes the embedding dimension
+            self._matrix = np.empty(
+                (self.INITIAL_CAPACITY, quantized.shape[0]), dtype=np.int8
+            )
+        elif self._count == self._matrix.shape[0]:
+            # Double capacity so appends stay amortized O(1)
+            grown = np.empty(
+                (self._matrix.shape[0] * 2, self._matrix.shape[1]), dtype=np.int8
+            )
+            grown[:self._count] = self._matrix[:self._count]
+            self._matrix = grown
+
+        self._matrix[self._count] = quantized
+        self._count += 1
+        self.ids.append(face_id)
+        logger.info(f"Registered new face: {face_id}")
+        return face_id
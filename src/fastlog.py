@@ -0,0 +1,70 @@
+import threading
+from collections import deque
+from loguru import logger
+
+# Format strings preregistered by small integer id so the hot path only
+# enqueues raw tuples; all string formatting happens on the drain thread
+FMT_PROGRESS = 0
+FMT_TRACKER_ADDED = 1
+FMT_TRACKER_REMOVED = 2
+
+FORMATS = {
+    FMT_PROGRESS: "Processed {} frames, FPS: {:.2f}",
+    FMT_TRACKER_ADDED: "Added face {} to tracker {}",
+    FMT_TRACKER_REMOVED: "Removed lost tracker {}",
+}
+
+# Bounded ring: deque appends are thread-safe and the oldest record drops
+# when full — logs are best-effort telemetry, never a frame-loop stall
+_MAX_RECORDS = 4096
+_DRAIN_BATCH = 256
+
+_records = deque(maxlen=_MAX_RECORDS)
+_wakeup = threading.Event()
+_thread = None
+_thread_lock = threading.Lock()
+
+def emit(level, fmt_id, *args):
+    """
+    Queue a log record without formatting it
+    Args:
+        level: loguru level name (e.g. 'INFO')
+        fmt_id: One of the FMT_* format ids
+        args: Values substituted into the format string when drained
+    """
+    _ensure_drain_thread()
+    _records.append((level, fmt_id, args))
+    _wakeup.set()
+
+def _ensure_drain_thread():
+    """
+    Start the background drain thread on first use
+    """
+    global _thread
+    if _thread is not None:
+        return
+    with _thread_lock:
+        if _thread is None:
+            _thread = threading.Thread(target=_drain, daemon=True)
+            _thread.start()
+
+def _drain():
+    """
+    Drain thread: format queued records in batches and forward to loguru
+    """
+    while True:
+        _wakeup.wait()
+        _wakeup.clear()
+        # Keep draining in batches until the ring is empty: more than one
+        # batch may have queued since the event was set, and nothing
+        # re-sets it for records that are already enqueued
+        while _records:
+            for _ in range(_DRAIN_BATCH):
+                try:
+                    level, fmt_id, args = _records.popleft()
+                except IndexError:
+                    break
+                try:
+                    logger.log(level, FORMATS[fmt_id].format(*args))
+                except Exception:
+                    pass  # Never let a bad record kill the drain thread
@@ -2,15 +2,24 @@ import os
 import sys
 from loguru import logger
 
+# Sinks are process-wide, so configuration only needs to run once;
+# repeat setup_logger calls (e.g. across tests) return immediately
+_LOGGER_CONFIGURED = False
+
 def setup_logger(log_dir, log_level="INFO", rotation="10 MB", retention="7 days"):
     """
-    Setup comprehensive logging configuration
+    Setup comprehensive logging configuration (idempotent: repeat calls
+    in the same process reuse the already-configured sinks)
     Args:
         log_dir: Directory for log files
         log_level: Logging level (DEBUG, INFO, WARNING, ERROR)
         rotation: Log file rotation size
         retention: Log file retention period
     """
+    global _LOGGER_CONFIGURED
+    if _LOGGER_CONFIGURED:
+        return logger
+
     try:
         # Ensure log directory exists
         os.makedirs(log_dir, exist_ok=True)
@@ -18,24 +27,31 @@ def setup_logger(log_dir, log_level="INFO", rotation="10 MB", retention="7 days"
         # Remove default logger
         logger.remove()
         
-        # Add console logger
+        # All sinks use enqueue=True so formatting and I/O happen on a
+        # background thread instead of stalling the per-frame hot path
+
+        # Add console logger (skip ANSI color codes when not on a terminal)
         logger.add(
             sys.stdout,
             format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>",
             level=log_level,
-            colorize=True
+            colorize=sys.stdout.isatty(),
+            enqueue=True
         )
-        
-        # Add file logger with rotation
+
+        # Add file logger with rotation; the 64 KiB open() buffer coalesces
+        # records into large writes before they hit disk
         logger.add(
             os.path.join(log_dir, "events.log"),
             format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}",
             level=log_level,
             rotation=rotation,
             retention=retention,
-            compression="zip"
+            compression="zip",
+            enqueue=True,
+            buffering=1 << 16
         )
-        
+
         # Add error logger
         logger.add(
             os.path.join(log_dir, "errors.log"),
@@ -43,12 +59,15 @@ def setup_logger(log_dir, log_level="INFO", rotation="10 MB", retention="7 days"
             level="ERROR",
             rotation=rotation,
             retention=retention,
-            compression="zip"
+            compression="zip",
+            enqueue=True,
+            buffering=1 << 16
         )
         
         logger.info(f"Logging configured - Level: {log_level}, Directory: {log_dir}")
+        _LOGGER_CONFIGURED = True
         return logger
-        
+
     except Exception as e:
         print(f"Error setting up logger: {e}")
         # Fallback to basic logging
@@ -1,19 +1,103 @@
+# cv2 and the pipeline stack (and everything they drag in) are imported
+# inside the functions that need them: --help and config errors shouldn't
+# pay hundreds of MB of shared-library load just to print and exit
 import os
+import itertools
 import json
-import cv2
+import queue
+import threading
 import time
 import argparse
 from loguru import logger
-from .face_pipeline import FacePipeline
-from .utils import create_directories, format_time_duration
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Recycled decode buffers handed to cap.read()'s 2-arg overload, so steady
+# state allocates zero frame arrays. The pool must exceed every frame that
+# can be in flight at once (frame queue + output queue + one being processed
+# + one being written); by the time the cycle returns to a buffer, the
+# bounded queues guarantee it has been released. That guarantee only holds
+# under FIFO backpressure: LIFO webcam sources never block the capture
+# thread, which would lap the pool and overwrite frames still in flight,
+# so they allocate per frame instead (frame_pool=None)
+FRAME_POOL_SIZE = 16
+
+# Encoder-side queue depth: enough slack that a slow libx264 keyframe
+# never stalls the frame loop, small enough to bound latency and memory
+ENCODE_QUEUE_SIZE = 8
+
+def _capture_frames(cap, frame_q, frame_pool, stop_event):
+    """
+    Producer thread: decode frames so capture overlaps inference
+    """
+    buffers = itertools.cycle(frame_pool) if frame_pool else None
+    while not stop_event.is_set():
+        # cv2 decodes into the supplied buffer when shapes match and only
+        # reallocates on a size change, so we keep the returned array
+        if buffers is not None:
+            ret, frame = cap.read(next(buffers))
+        else:
+            ret, frame = cap.read()
+        if not ret:
+            logger.info("End of video stream or cannot read frame.")
+            break
+        frame_q.put(frame)
+    frame_q.put(None)  # EOF sentinel
+
+def _write_frames(out_q, writer, show_display, display_every, stop_event):
+    """
+    Writer thread: encode and/or display processed frames
+    Args:
+        display_every: Render only every Nth frame, so display (and the
+            >=1ms GUI event poll in cv2.waitKey) never caps processing FPS
+    """
+    import cv2
+    from .utils import get_timestamp
+
+    frame_idx = 0
+    while True:
+        frame = out_q.get()
+        if frame is None:
+            break
+        frame_idx += 1
+
+        # Write to output video
+        if writer:
+            writer.write(frame)
+
+        # Display frame (imshow and waitKey only run on rendered frames;
+        # headless runs never touch GUI code at all)
+        if show_display and frame_idx % display_every == 0:
+            cv2.imshow('Face Tracker', frame)
+
+            # Handle key presses
+            key = cv2.waitKey(1) & 0xFF
+            if key == ord('q'):
+                logger.info("User requested quit")
+                stop_event.set()
+            elif key == ord('s'):
+                # Save current frame (memoized timestamp, no strftime)
+                timestamp = get_timestamp()
+                cv2.imwrite(f"snapshot_{timestamp}.jpg", frame)
+                logger.info(f"Snapshot saved: snapshot_{timestamp}.jpg")
+
+    if show_display:
+        cv2.destroyAllWindows()
 
 def load_config(config_path='config.json'):
     """
     Load configuration from JSON file
     """
     try:
-        with open(config_path, 'r') as f:
-            config = json.load(f)
+        # orjson parses the small config noticeably faster and takes bytes
+        # directly; stdlib json covers installs without it
+        with open(config_path, 'rb') as f:
+            raw = f.read()
+        config = orjson.loads(raw) if ORJSON_AVAILABLE else json.loads(raw)
         logger.info(f"Configuration loaded from {config_path}")
         return config
     except Exception as e:
@@ -29,6 +113,11 @@ def process_video(video_source, pipeline, output_path=None, show_display=True):
         output_path: Optional output video path
         show_display: Whether to show live display
     """
+    import cv2
+    import numpy as np
+    from .utils import format_time_duration, LatestFrameBuffer
+    from . import fastlog
+
     try:
         # Open video capture
         if isinstance(video_source, int):
@@ -55,54 +144,78 @@ def process_video(video_source, pipeline, output_path=None, show_display=True):
             writer = cv2.VideoWriter(output_path, fourcc, fps, (width, height))
             logger.info(f"Output video will be saved to: {output_path}")
         
-        # Process frames
+        # Process frames; monotonic_ns is integer math, immune to NTP
+        # wall-clock steps, and avoids per-check float conversion
         frame_count = 0
-        start_time = time.time()
-        
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                logger.info("End of video stream or cannot read frame.")
+        start_ns = time.monotonic_ns()
+
+        # Capture and write/display run on their own threads with bounded
+        # queues so decode and encode overlap inference; webcams get the
+        # LIFO buffer so lag never accumulates behind the pipeline
+        if isinstance(video_source, int):
+            frame_q = LatestFrameBuffer(maxlen=2)
+        else:
+            frame_q = queue.Queue(maxsize=4)
+        # Frames travel to the encoder/display thread without a copy: the
+        # capture pool is sized past the combined queue depths, so a pooled
+        # buffer is never recycled while it still sits in out_q
+        out_q = queue.Queue(maxsize=ENCODE_QUEUE_SIZE)
+        stop_event = threading.Event()
+        if isinstance(video_source, int):
+            # LIFO buffer means no backpressure: pooled buffers would be
+            # recycled while still queued, so live sources allocate fresh
+            frame_pool = None
+        else:
+            frame_pool = [np.empty((height, width, 3), dtype=np.uint8)
+                          for _ in range(FRAME_POOL_SIZE)]
+
+        capture_thread = threading.Thread(
+            target=_capture_frames, args=(cap, frame_q, frame_pool, stop_event), daemon=True)
+        # Cap the display at ~30 FPS regardless of source frame rate
+        display_every = max(1, fps // 30)
+        writer_thread = threading.Thread(
+            target=_write_frames,
+            args=(out_q, writer, show_display, display_every, stop_event), daemon=True)
+        capture_thread.start()
+        writer_thread.start()
+
+        while not stop_event.is_set():
+            frame = frame_q.get()
+            if frame is None:
                 break
-            
+
             frame_count += 1
-            
+
             # Process frame through pipeline
             processed_frame = pipeline.process_frame(frame)
-            
-            # Write to output video
-            if writer:
-                writer.write(processed_frame)
-            
-            # Display frame
-            if show_display:
-                cv2.imshow('Face Tracker', processed_frame)
-                
-                # Handle key presses
-                key = cv2.waitKey(1) & 0xFF
-                if key == ord('q'):
-                    logger.info("User requested quit")
-                    break
-                elif key == ord('s'):
-                    # Save current frame
-                    timestamp = time.strftime("%Y%m%d_%H%M%S")
-                    cv2.imwrite(f"snapshot_{timestamp}.jpg", processed_frame)
-                    logger.info(f"Snapshot saved: snapshot_{timestamp}.jpg")
-            
-            # Log progress
+            out_q.put(processed_frame)
+
+            # Log progress through the ring buffer so the frame loop never
+            # pays for string formatting or a blocking sink
             if frame_count % 100 == 0:
-                elapsed_time = time.time() - start_time
-                fps_actual = frame_count / elapsed_time
-                logger.info(f"Processed {frame_count} frames, FPS: {fps_actual:.2f}")
-        
-        # Cleanup
+                elapsed_ns = time.monotonic_ns() - start_ns
+                fps_actual = frame_count * 1_000_000_000 // elapsed_ns
+                fastlog.emit("INFO", fastlog.FMT_PROGRESS, frame_count, fps_actual)
+
+        # Cleanup: the capture thread may be blocked in frame_q.put() when
+        # the user quits, so drain the queue while joining it — releasing
+        # cap while cap.read() still runs on the other thread is undefined
+        stop_event.set()
+        while capture_thread.is_alive():
+            if isinstance(frame_q, queue.Queue):
+                try:
+                    frame_q.get_nowait()
+                except queue.Empty:
+                    pass
+            capture_thread.join(timeout=0.1)
+        out_q.put(None)
+        writer_thread.join()
         cap.release()
         if writer:
             writer.release()
-        cv2.destroyAllWindows()
         
         # Final statistics
-        total_time = time.time() - start_time
+        total_time = (time.monotonic_ns() - start_ns) / 1e9
         logger.info(f"Processing completed:")
         logger.info(f"  Total frames: {frame_count}")
         logger.info(f"  Total time: {format_time_duration(total_time)}")
@@ -136,7 +249,11 @@ def main():
     try:
         # Load configuration
         config = load_config(args.config)
-        
+
+        # Heavy imports happen only once the config has parsed cleanly
+        from .face_pipeline import FacePipeline
+        from .utils import create_directories
+
         # Override video source if provided
         video_source = None
         if args.video:
@@ -1,38 +1,81 @@
 import cv2
 import numpy as np
 from loguru import logger
-from collections import defaultdict
+from . import fastlog
 
 class FaceTracker:
-    def __init__(self, tracker_type='CSRT'):
+    def __init__(self, tracker_type='MOSSE', validation_tracker_type='CSRT', validate_every=10):
         """
         Initialize face tracker
         Args:
-            tracker_type: Type of OpenCV tracker ('CSRT', 'KCF', 'MOSSE', etc.)
+            tracker_type: Bulk tracker type ('MOSSE', 'KCF', 'CSRT')
+            validation_tracker_type: Slower, more robust tracker used for
+                periodic revalidation (None disables tiering)
+            validate_every: Run one validation pass every N frames
         """
-        self.trackers = {}
         self.tracker_type = tracker_type
+        self.validation_tracker_type = validation_tracker_type
+        self.validate_every = validate_every
         self.next_tracker_id = 0
-        self.tracked_faces = {}  # {tracker_id: face_info}
-        self.lost_trackers = defaultdict(int)  # Count frames lost for each tracker
+        self.frame_idx = 0
         self.max_lost_frames = 30  # Remove tracker after this many lost frames
-        
-        logger.info(f"Face tracker initialized with {tracker_type} algorithm")
 
-    def create_tracker(self):
+        # Two-tier tracking: cheap MOSSE carries every frame, and once per
+        # validate_every frames the trackers are re-anchored through one
+        # CSRT pass to correct accumulated drift
+        self._validating = False
+        self._needs_rebuild = False
+
+        # Per-tracker state as struct-of-arrays, positionally parallel to
+        # the MultiTracker's internal order: boxes and lost counters live
+        # in contiguous NumPy arrays so the per-frame bookkeeping and the
+        # lost-frame sweep are vectorized instead of dict lookups per slot
+        self._tracker_ids = []
+        self._face_ids = []
+        self._trackers = []  # Per-face trackers on the fallback path
+        self._bboxes = np.zeros((0, 4), dtype=np.int32)  # (x1, y1, x2, y2)
+        self._lost = np.zeros(0, dtype=np.int32)
+        self._tid_to_idx = {}  # O(1) tracker-id -> row lookup for removals
+
+        # MultiTracker updates every tracker in one native call, crossing
+        # the Python/C++ boundary (and the GIL) once per frame instead of
+        # once per face; fall back to per-face trackers without contrib
+        self.use_multi = hasattr(cv2, 'legacy') and hasattr(cv2.legacy, 'MultiTracker_create')
+        self.multi = cv2.legacy.MultiTracker_create() if self.use_multi else None
+
+        # Row indices present in the MultiTracker, in its positional order.
+        # Rebuilds skip lost slots, so this can be a subset of all rows
+        self._multi_rows = []
+
+        # Raw float boxes from the previous batched update, positionally
+        # aligned with _multi_rows; invalidated whenever the MultiTracker
+        # is rebuilt. Used to catch trackers whose box has frozen
+        self._prev_multi_boxes = None
+
+        logger.info(f"Face tracker initialized with {tracker_type} algorithm "
+                    f"(batched={self.use_multi})")
+
+    def __len__(self):
+        return len(self._tracker_ids)
+
+    def create_tracker(self, tracker_type=None):
         """
         Create a new tracker instance
+        Args:
+            tracker_type: Tracker type override; defaults to the bulk type
         Returns:
             OpenCV tracker instance
         """
-        if self.tracker_type == 'CSRT':
-            return cv2.TrackerCSRT_create()
-        elif self.tracker_type == 'KCF':
-            return cv2.TrackerKCF_create()
-        elif self.tracker_type == 'MOSSE':
-            return cv2.TrackerMOSSE_create()
-        else:
-            return cv2.TrackerCSRT_create()
+        tracker_type = tracker_type or self.tracker_type
+        # Prefer the legacy namespace: legacy trackers are what the legacy
+        # MultiTracker accepts, and MOSSE only exists there on OpenCV 4.x
+        legacy = getattr(cv2, 'legacy', cv2)
+        factory = (getattr(legacy, f'Tracker{tracker_type}_create', None)
+                   or getattr(cv2, f'Tracker{tracker_type}_create', None))
+        if factory is None:
+            factory = (getattr(legacy, 'TrackerCSRT_create', None)
+                       or cv2.TrackerCSRT_create)
+        return factory()
 
     def add_face(self, frame, bbox, face_id=None):
         """
@@ -46,25 +89,34 @@ class FaceTracker:
         """
         tracker_id = self.next_tracker_id
         self.next_tracker_id += 1
-        
+
         # Create new tracker
         tracker = self.create_tracker()
         x1, y1, x2, y2 = bbox[:4]
-        bbox_cv = (x1, y1, x2 - x1, y2 - y1)  # OpenCV format: (x, y, width, height)
-        
-        success = tracker.init(frame, bbox_cv)
-        if success:
-            self.trackers[tracker_id] = tracker
-            self.tracked_faces[tracker_id] = {
-                'face_id': face_id,
-                'bbox': bbox,
-                'lost_frames': 0
-            }
-            logger.info(f"Added face {face_id} to tracker {tracker_id}")
-            return tracker_id
+        bbox_cv = (int(x1), int(y1), int(x2 - x1), int(y2 - y1))  # OpenCV format: (x, y, width, height)
+
+        if self.use_multi:
+            self.multi.add(tracker, frame, bbox_cv)
         else:
-            logger.warning(f"Failed to initialize tracker for face {face_id}")
-            return None
+            success = tracker.init(frame, bbox_cv)
+            if not success and success is not None:
+                logger.warning(f"Failed to initialize tracker for face {face_id}")
+                return None
+
+        # Appends are event-driven (a new face entering), so the O(K) array
+        # grow here is nowhere near the per-frame path
+        self._tracker_ids.append(tracker_id)
+        self._face_ids.append(face_id)
+        self._trackers.append(None if self.use_multi else tracker)
+        self._tid_to_idx[tracker_id] = len(self._tracker_ids) - 1
+        if self.use_multi:
+            self._multi_rows.append(len(self._tracker_ids) - 1)
+        row = np.array([[int(x1), int(y1), int(x2), int(y2)]], dtype=np.int32)
+        self._bboxes = np.concatenate([self._bboxes, row])
+        self._lost = np.concatenate([self._lost, np.zeros(1, dtype=np.int32)])
+
+        fastlog.emit("INFO", fastlog.FMT_TRACKER_ADDED, face_id, tracker_id)
+        return tracker_id
 
     def update(self, frame):
         """
@@ -74,47 +126,152 @@ class FaceTracker:
         Returns:
             List of tracked faces with their bounding boxes and IDs
         """
-        active_trackers = []
-        
-        for tracker_id, tracker in list(self.trackers.items()):
-            success, bbox = tracker.update(frame)
-            
-            if success:
-                # Update tracked face info
-                x, y, w, h = bbox
-                new_bbox = (int(x), int(y), int(x + w), int(y + h))
-                self.tracked_faces[tracker_id]['bbox'] = new_bbox
-                self.tracked_faces[tracker_id]['lost_frames'] = 0
-                
-                active_trackers.append({
-                    'tracker_id': tracker_id,
-                    'face_id': self.tracked_faces[tracker_id]['face_id'],
-                    'bbox': new_bbox
-                })
-            else:
-                # Increment lost frames counter
-                self.tracked_faces[tracker_id]['lost_frames'] += 1
-                self.lost_trackers[tracker_id] += 1
-                
-                # Remove tracker if lost for too many frames
-                if self.lost_trackers[tracker_id] > self.max_lost_frames:
-                    self.remove_tracker(tracker_id)
-                    logger.info(f"Removed lost tracker {tracker_id}")
-        
+        self.frame_idx += 1
+        count = len(self._tracker_ids)
+        if count == 0:
+            return []
+
+        if self._needs_rebuild:
+            self._rebuild(frame, self.tracker_type)
+            self._needs_rebuild = False
+
+        frame_h, frame_w = frame.shape[:2]
+
+        if self.use_multi:
+            # Single native call updates every tracker; per-slot loss is
+            # inferred from degenerate, out-of-frame, or frozen boxes, all
+            # in one vectorized pass over the box array. The boolean the
+            # MultiTracker returns is deliberately ignored: it goes False
+            # when ANY target is lost, which would wrongly kill every slot
+            rows = np.asarray(self._multi_rows, dtype=np.intp)
+            _, boxes = self.multi.update(frame)
+            boxes = np.asarray(boxes, dtype=np.float64).reshape(rows.size, 4)
+            x, y, w, h = boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3]
+            box_ok = ((w > 0) & (h > 0) & (x + w > 0) & (y + h > 0)
+                      & (x < frame_w) & (y < frame_h))
+            # Legacy trackers signal failure by leaving their box untouched
+            # rather than degenerating it, so a lost target's box freezes
+            # in-frame and would pass the test above forever. A box that is
+            # bit-identical to the previous frame's marks its slot lost:
+            # live correlation trackers jitter at sub-pixel precision.
+            # Boxes appended since the last update (add_face) line up as a
+            # positional prefix extension, so comparing the common prefix
+            # stays aligned and new slots are simply exempt for one frame
+            if self._prev_multi_boxes is not None:
+                n = min(self._prev_multi_boxes.shape[0], rows.size)
+                box_ok[:n] &= (boxes[:n] != self._prev_multi_boxes[:n]).any(axis=1)
+            self._prev_multi_boxes = boxes
+            xyxy = np.empty((rows.size, 4), dtype=np.int32)
+            xyxy[:, 0] = x
+            xyxy[:, 1] = y
+            xyxy[:, 2] = x + w
+            xyxy[:, 3] = y + h
+            # Rows absent from the MultiTracker (lost slots) stay invalid
+            valid = np.zeros(count, dtype=bool)
+            valid[rows[box_ok]] = True
+            self._bboxes[rows[box_ok]] = xyxy[box_ok]
+        else:
+            valid = np.zeros(count, dtype=bool)
+            for i, tracker in enumerate(self._trackers):
+                success, box = tracker.update(frame)
+                if success:
+                    x, y, w, h = box
+                    self._bboxes[i] = (int(x), int(y), int(x + w), int(y + h))
+                    valid[i] = True
+
+        self._lost[valid] = 0
+        self._lost[~valid] += 1
+
+        active_trackers = [{
+            'tracker_id': self._tracker_ids[i],
+            'face_id': self._face_ids[i],
+            'bbox': tuple(int(v) for v in self._bboxes[i])
+        } for i in np.nonzero(valid)[0]]
+
+        # One SIMD comparison replaces the per-slot lost-frame checks
+        if (self._lost > self.max_lost_frames).any():
+            self._drop_lost_slots(frame)
+
+        # Tier switch: the frame after a CSRT validation pass has run, drop
+        # back to the cheap bulk tracker re-anchored at the refined boxes
+        if self.validation_tracker_type and self._tracker_ids:
+            if self._validating:
+                self._rebuild(frame, self.tracker_type)
+                self._validating = False
+            elif self.frame_idx % self.validate_every == 0:
+                self._rebuild(frame, self.validation_tracker_type)
+                self._validating = True
+
         return active_trackers
 
-    def remove_tracker(self, tracker_id):
+    def _rebuild(self, frame, tracker_type):
+        """
+        Recreate trackers of the given type at the current boxes. Slots
+        with a non-zero lost count are skipped: a fresh tracker anchored
+        at a stale box reports success again, which would reset the lost
+        counter and resurrect ghost tracks forever
+        """
+        if self.use_multi:
+            self.multi = cv2.legacy.MultiTracker_create()
+            self._multi_rows = []
+            self._prev_multi_boxes = None
+        for i in range(len(self._tracker_ids)):
+            if self._lost[i] > 0:
+                continue
+            x1, y1, x2, y2 = (int(v) for v in self._bboxes[i])
+            bbox_cv = (x1, y1, x2 - x1, y2 - y1)
+            tracker = self.create_tracker(tracker_type)
+            if self.use_multi:
+                self.multi.add(tracker, frame, bbox_cv)
+                self._multi_rows.append(i)
+            else:
+                tracker.init(frame, bbox_cv)
+                self._trackers[i] = tracker
+
+    def _keep(self, mask):
+        """
+        Compact all parallel state down to the rows selected by mask,
+        preserving order (positions must stay aligned with the MultiTracker)
+        """
+        self._tracker_ids = [tid for tid, k in zip(self._tracker_ids, mask) if k]
+        self._face_ids = [fid for fid, k in zip(self._face_ids, mask) if k]
+        self._trackers = [t for t, k in zip(self._trackers, mask) if k]
+        self._bboxes = self._bboxes[mask]
+        self._lost = self._lost[mask]
+        self._tid_to_idx = {tid: i for i, tid in enumerate(self._tracker_ids)}
+
+    def _drop_lost_slots(self, frame):
+        """
+        Drop slots lost for too long; the MultiTracker has no removal API,
+        so the batched path is rebuilt from the surviving slots (rare)
+        """
+        keep = self._lost <= self.max_lost_frames
+        for i in np.nonzero(~keep)[0]:
+            fastlog.emit("INFO", fastlog.FMT_TRACKER_REMOVED, self._tracker_ids[i])
+
+        self._keep(keep)
+        if self.use_multi:
+            self._rebuild(frame, self.tracker_type)
+
+    def remove_tracker(self, tracker_id, frame=None):
         """
         Remove a tracker
         Args:
             tracker_id: ID of tracker to remove
+            frame: Current frame, needed to rebuild the batched tracker
         """
-        if tracker_id in self.trackers:
-            del self.trackers[tracker_id]
-        if tracker_id in self.tracked_faces:
-            del self.tracked_faces[tracker_id]
-        if tracker_id in self.lost_trackers:
-            del self.lost_trackers[tracker_id]
+        idx = self._tid_to_idx.get(tracker_id)
+        if idx is None:
+            return
+        mask = np.ones(len(self._tracker_ids), dtype=bool)
+        mask[idx] = False
+        self._keep(mask)
+        if self.use_multi:
+            if frame is not None:
+                self._rebuild(frame, self.tracker_type)
+            else:
+                # No frame to re-anchor on; rebuild at the next update()
+                self._needs_rebuild = True
 
     def get_tracked_face_ids(self):
         """
@@ -122,7 +279,7 @@ class FaceTracker:
         Returns:
             List of face IDs
         """
-        return [info['face_id'] for info in self.tracked_faces.values() if info['face_id'] is not None]
+        return [fid for fid in self._face_ids if fid is not None]
 
     def update_face_id(self, tracker_id, face_id):
         """
@@ -131,15 +288,23 @@ class FaceTracker:
             tracker_id: Tracker ID
             face_id: New face ID
         """
-        if tracker_id in self.tracked_faces:
-            self.tracked_faces[tracker_id]['face_id'] = face_id
+        idx = self._tid_to_idx.get(tracker_id)
+        if idx is not None:
+            self._face_ids[idx] = face_id
 
     def clear(self):
         """
         Clear all trackers
         """
-        self.trackers.clear()
-        self.tracked_faces.clear()
-        self.lost_trackers.clear()
+        self._tracker_ids = []
+        self._face_ids = []
+        self._trackers = []
+        self._bboxes = np.zeros((0, 4), dtype=np.int32)
+        self._lost = np.zeros(0, dtype=np.int32)
+        self._tid_to_idx = {}
+        self._multi_rows = []
+        self._prev_multi_boxes = None
+        if self.use_multi:
+            self.multi = cv2.legacy.MultiTracker_create()
         self.next_tracker_id = 0
-        logger.info("All trackers cleared") 
\ No newline at end of file
+        logger.info("All trackers cleared")
@@ -1,17 +1,120 @@
 import os
+import itertools
+import threading
+import time
 import cv2
 import numpy as np
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from PIL import Image
+from functools import lru_cache
 from loguru import logger
 
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """Fallback no-op decorator when Numba is not installed"""
+        if args and callable(args[0]):
+            return args[0]
+        def wrap(func):
+            return func
+        return wrap
+
+class LatestFrameBuffer:
+    """
+    Bounded LIFO frame buffer for live video sources.
+    A camera produces frames faster than the pipeline consumes them, and a
+    FIFO queue accumulates lag. This buffer keeps only the newest frames
+    (the deque drops the oldest) so the consumer always processes the
+    freshest frame and latency stays at inference time, not queue depth.
+    """
+
+    def __init__(self, maxlen=2):
+        self._buffer = deque(maxlen=maxlen)
+        self._condition = threading.Condition()
+        self._closed = False
+
+    def put(self, frame):
+        """
+        Add a frame; passing None marks end of stream
+        """
+        with self._condition:
+            if frame is None:
+                self._closed = True
+            else:
+                self._buffer.append(frame)  # oldest frame drops when full
+            self._condition.notify()
+
+    def get(self):
+        """
+        Block until a frame is available; returns None at end of stream
+        """
+        with self._condition:
+            while not self._buffer and not self._closed:
+                self._condition.wait()
+            if self._buffer:
+                frame = self._buffer.pop()  # newest first
+                self._buffer.clear()        # stale frames are never processed
+                return frame
+            return None
+
+# Timestamp strings memoized by integer second: [epoch_sec, ts_str, date_str].
+# strftime runs at most once per second instead of twice per face save
+_ts_cache = [0, "", ""]
+
+def _refresh_ts_cache():
+    """Regenerate the cached timestamp strings if the second has rolled over"""
+    sec = int(time.time())
+    if sec != _ts_cache[0]:
+        _ts_cache[0] = sec
+        _ts_cache[1] = datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
+        # The date folder is the timestamp's date prefix, so a slice
+        # replaces a second strftime (and stays correct across midnight)
+        _ts_cache[2] = _ts_cache[1][:10]
+
 def get_timestamp():
     """Get current timestamp in formatted string"""
-    return datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
+    _refresh_ts_cache()
+    return _ts_cache[1]
 
 def get_date_folder():
     """Get current date folder name"""
-    return datetime.now().strftime('%Y-%m-%d')
+    _refresh_ts_cache()
+    return _ts_cache[2]
+
+# Background writer so the frame loop never blocks on JPEG encode + disk
+_image_writer = ThreadPoolExecutor(max_workers=2, thread_name_prefix='img-io')
+
+# Monotonic suffix keeping filenames unique now that timestamps only have
+# one-second resolution
+_save_counter = itertools.count()
+
+# Directories already created this run; skips a stat() syscall per save
+_created_dirs = set()
+_created_dirs_lock = threading.Lock()
+
+def _ensure_dir(path):
+    """Create a directory once per process instead of per call"""
+    if path in _created_dirs:
+        return
+    with _created_dirs_lock:
+        if path not in _created_dirs:
+            os.makedirs(path, exist_ok=True)
+            _created_dirs.add(path)
+
+def _write_image(path, image):
+    """
+    Encode and write an image on the writer thread
+    """
+    try:
+        cv2.imwrite(path, image, [cv2.IMWRITE_JPEG_QUALITY, 85])
+        logger.info(f"Saved face image: {path}")
+    except Exception as e:
+        logger.error(f"Error saving face image: {e}")
 
 def save_cropped_face(image, save_dir, face_id, event_type):
     """
@@ -28,27 +131,33 @@ def save_cropped_face(image, save_dir, face_id, event_type):
         # Create date-based folder structure
         date_folder = get_date_folder()
         full_save_dir = os.path.join(save_dir, 'entries', date_folder)
-        os.makedirs(full_save_dir, exist_ok=True)
-        
+        _ensure_dir(full_save_dir)
+
         # Generate filename
         timestamp = get_timestamp()
-        filename = f'{face_id}_{event_type}_{timestamp}.jpg'
+        filename = f'{face_id}_{event_type}_{timestamp}_{next(_save_counter)}.jpg'
         path = os.path.join(full_save_dir, filename)
-        
-        # Convert BGR to RGB if needed and save
-        if len(image.shape) == 3 and image.shape[2] == 3:
-            # Convert BGR to RGB for PIL
-            image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-            Image.fromarray(image_rgb).save(path)
-        else:
-            Image.fromarray(image).save(path)
-        
-        logger.info(f"Saved face image: {path}")
+
+        # cv2.imwrite encodes straight from BGR (libjpeg-turbo), skipping
+        # the old BGR->RGB copy and PIL round-trip. The crop is usually a
+        # view into the live frame buffer, so copy before handing it to
+        # the writer thread
+        _image_writer.submit(_write_image, path, image.copy())
         return path
     except Exception as e:
         logger.error(f"Error saving face image: {e}")
         return None
 
+@lru_cache(maxsize=8)
+def _resize_dims(height, width, max_size):
+    """
+    Target dimensions preserving aspect ratio, memoized per input shape
+    (frame sizes are fixed per video, so this computes once per stream)
+    """
+    if height > width:
+        return int(width * max_size / height), max_size
+    return max_size, int(height * max_size / width)
+
 def resize_image(image, max_size=640):
     """
     Resize image while maintaining aspect ratio
@@ -58,24 +167,39 @@ def resize_image(image, max_size=640):
     Returns:
         Resized image
     """
-    try:
-        height, width = image.shape[:2]
-        if height <= max_size and width <= max_size:
-            return image
-        
-        # Calculate new dimensions
-        if height > width:
-            new_height = max_size
-            new_width = int(width * max_size / height)
-        else:
-            new_width = max_size
-            new_height = int(height * max_size / width)
-        
-        return cv2.resize(image, (new_width, new_height))
-    except Exception as e:
-        logger.error(f"Error resizing image: {e}")
+    height, width = image.shape[:2]
+    if height <= max_size and width <= max_size:
         return image
 
+    new_width, new_height = _resize_dims(height, width, max_size)
+    # INTER_AREA is both faster and cleaner for downscales; this branch
+    # only ever shrinks, since same-or-smaller images returned above
+    return cv2.resize(image, (new_width, new_height), interpolation=cv2.INTER_AREA)
+
+FONT = cv2.FONT_HERSHEY_SIMPLEX
+
+# Pre-rendered label strips: tracked-face labels repeat across frames, so
+# text measurement + glyph rendering happen once per label and each draw
+# afterwards is a single patch copy
+_label_cache = {}
+_LABEL_CACHE_MAX = 256
+
+def _label_patch(label, color):
+    """
+    Get (or render once) the background + text strip for a label
+    """
+    key = (label, color)
+    patch = _label_cache.get(key)
+    if patch is None:
+        if len(_label_cache) >= _LABEL_CACHE_MAX:
+            _label_cache.clear()  # Labels are few in practice; reset is fine
+        (text_width, text_height), _ = cv2.getTextSize(label, FONT, 0.6, 1)
+        patch = np.empty((text_height + 10, text_width, 3), dtype=np.uint8)
+        patch[:] = color
+        cv2.putText(patch, label, (0, text_height + 5), FONT, 0.6, (255, 255, 255), 1)
+        _label_cache[key] = patch
+    return patch
+
 def draw_bbox(image, bbox, label=None, color=(0, 255, 0), thickness=2):
     """
     Draw bounding box on image
@@ -89,50 +213,72 @@ def draw_bbox(image, bbox, label=None, color=(0, 255, 0), thickness=2):
         Image with drawn bounding box
     """
     try:
-        x1, y1, x2, y2 = bbox[:4]
+        x1, y1, x2, y2 = (int(v) for v in bbox[:4])
         cv2.rectangle(image, (x1, y1), (x2, y2), color, thickness)
-        
+
         if label:
-            # Add label background
-            (text_width, text_height), _ = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.6, 1)
-            cv2.rectangle(image, (x1, y1 - text_height - 10), (x1 + text_width, y1), color, -1)
-            
-            # Add label text
-            cv2.putText(image, label, (x1, y1 - 5), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1)
-        
+            # Blit the cached label strip above the box, clamped to frame
+            patch = _label_patch(label, tuple(color))
+            patch_h, patch_w = patch.shape[:2]
+            top = y1 - patch_h
+            ys, xs = max(top, 0), max(x1, 0)
+            ye = min(top + patch_h, image.shape[0])
+            xe = min(x1 + patch_w, image.shape[1])
+            if ye > ys and xe > xs:
+                image[ys:ye, xs:xe] = patch[ys - top:ye - top, xs - x1:xe - x1]
+
         return image
     except Exception as e:
         logger.error(f"Error drawing bounding box: {e}")
         return image
 
+@njit(cache=True)
 def calculate_iou(box1, box2):
     """
     Calculate Intersection over Union (IoU) between two bounding boxes
+    JIT-compiled with Numba when available; pure-Python math otherwise
     Args:
         box1: First bounding box (x1, y1, x2, y2)
         box2: Second bounding box (x1, y1, x2, y2)
     Returns:
         IoU value (0-1)
     """
-    try:
-        # Calculate intersection coordinates
-        x1 = max(box1[0], box2[0])
-        y1 = max(box1[1], box2[1])
-        x2 = min(box1[2], box2[2])
-        y2 = min(box1[3], box2[3])
-        
-        # Calculate intersection area
-        intersection = max(0, x2 - x1) * max(0, y2 - y1)
-        
-        # Calculate union area
-        area1 = (box1[2] - box1[0]) * (box1[3] - box1[1])
-        area2 = (box2[2] - box2[0]) * (box2[3] - box2[1])
-        union = area1 + area2 - intersection
-        
-        return intersection / union if union > 0 else 0
-    except Exception as e:
-        logger.error(f"Error calculating IoU: {e}")
-        return 0
+    # Calculate intersection coordinates
+    x1 = max(box1[0], box2[0])
+    y1 = max(box1[1], box2[1])
+    x2 = min(box1[2], box2[2])
+    y2 = min(box1[3], box2[3])
+
+    # Calculate intersection area
+    intersection = max(0, x2 - x1) * max(0, y2 - y1)
+
+    # Calculate union area
+    area1 = (box1[2] - box1[0]) * (box1[3] - box1[1])
+    area2 = (box2[2] - box2[0]) * (box2[3] - box2[1])
+    union = area1 + area2 - intersection
+
+    return intersection / union if union > 0 else 0
+
+def calculate_iou_batch(boxes_a, boxes_b):
+    """
+    Calculate IoU for every pair of boxes in one broadcast pass
+    Args:
+        boxes_a: (N, 4) array of boxes (x1, y1, x2, y2)
+        boxes_b: (M, 4) array of boxes (x1, y1, x2, y2)
+    Returns:
+        (N, M) array of IoU values (0-1)
+    """
+    x1 = np.maximum(boxes_a[:, None, 0], boxes_b[None, :, 0])
+    y1 = np.maximum(boxes_a[:, None, 1], boxes_b[None, :, 1])
+    x2 = np.minimum(boxes_a[:, None, 2], boxes_b[None, :, 2])
+    y2 = np.minimum(boxes_a[:, None, 3], boxes_b[None, :, 3])
+
+    intersection = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (boxes_a[:, 2] - boxes_a[:, 0]) * (boxes_a[:, 3] - boxes_a[:, 1])
+    area_b = (boxes_b[:, 2] - boxes_b[:, 0]) * (boxes_b[:, 3] - boxes_b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - intersection
+
+    return intersection / (union + 1e-9)
 
 def create_directories(base_path):
     """
@@ -148,7 +294,7 @@ def create_directories(base_path):
         ]
         
         for directory in directories:
-            os.makedirs(directory, exist_ok=True)
+            _ensure_dir(directory)
             logger.info(f"Created directory: {directory}")
     except Exception as e:
         logger.error(f"Error creating directories: {e}")
@@ -1,12 +1,72 @@
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, jsonify, request, send_from_directory
 import os
 import json
+import queue
+import threading
+import time
 from datetime import datetime
 from .database import Database
 from .utils import get_date_folder
 
+# Dashboard ships as a committed static file: it fetches stats and events
+# client-side, so there is nothing for Jinja to substitute
+TEMPLATES_DIR = os.path.join(os.path.dirname(__file__), 'templates')
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 app = Flask(__name__)
 
+def json_response(payload):
+    """
+    Serialize an API payload with orjson when available (C-level
+    serialization straight to bytes); falls back to Flask's jsonify
+    """
+    if ORJSON_AVAILABLE:
+        return app.response_class(orjson.dumps(payload), mimetype='application/json')
+    return jsonify(payload)
+
+@app.after_request
+def add_cache_headers(response):
+    """
+    Short-TTL caching for API responses: a 5s max-age lets a reverse
+    proxy absorb bursts of clients hitting the same snapshot (the SSE
+    stream is exempt — it must never be cached)
+    """
+    if (request.path.startswith('/api/') and request.path != '/api/stream'
+            and response.status_code == 200):
+        response.headers['Cache-Control'] = 'max-age=5'
+    return response
+
+# Per-client SSE queues fed by the pipeline's event callback; idle
+# clients block on their queue and cost nothing between events. When no
+# pipeline runs in this process (the standalone web server), the stream
+# falls back to polling the database server-side instead
+_stream_clients = set()
+_stream_lock = threading.Lock()
+_pipeline_wired = False
+
+# Database poll cadence for the no-pipeline fallback, still far cheaper
+# than every browser re-fetching the full event list
+_STREAM_POLL_SECONDS = 5.0
+
+def broadcast_event(event):
+    """
+    Push an event dict to every connected SSE client
+    Args:
+        event: Serializable event dict from FacePipeline
+    """
+    with _stream_lock:
+        clients = list(_stream_clients)
+    for client_q in clients:
+        try:
+            client_q.put_nowait(event)
+        except queue.Full:
+            pass  # Slow client; it can re-sync from /api/events
+
 class WebInterface:
     def __init__(self, config):
         """
@@ -25,15 +85,15 @@ class WebInterface:
     
     def get_recent_events(self, limit=20):
         """
-        Get recent events
+        Get recent events as column tuples
         """
-        return self.database.get_recent_events(limit)
-    
+        return self.database.get_recent_event_rows(limit)
+
     def get_visitor_events(self, face_id):
         """
-        Get events for specific visitor
+        Get events for specific visitor as column tuples
         """
-        return self.database.get_visitor_events(face_id)
+        return self.database.get_visitor_event_rows(face_id)
 
 # Global web interface instance
 web_interface = None
@@ -41,15 +101,24 @@ web_interface = None
 @app.route('/')
 def index():
     """
-    Main dashboard page
+    Main dashboard page, served straight from disk (no Jinja pass); the
+    page populates itself from /api/stats and /api/events
     """
-    if web_interface is None:
-        return "Web interface not initialized", 500
-    
-    stats = web_interface.get_statistics()
-    recent_events = web_interface.get_recent_events(10)
-    
-    return render_template('dashboard.html', stats=stats, events=recent_events)
+    return send_from_directory(TEMPLATES_DIR, 'dashboard.html', max_age=3600)
+
+def _event_dicts(rows):
+    """
+    Build serializable dicts from (id, face_id, event_type, timestamp,
+    image_path, confidence) tuples
+    """
+    return [{
+        'id': row[0],
+        'face_id': row[1],
+        'event_type': row[2],
+        'timestamp': row[3].isoformat(),
+        'image_path': row[4],
+        'confidence': row[5]
+    } for row in rows]
 
 @app.route('/api/stats')
 def api_stats():
@@ -58,9 +127,9 @@ def api_stats():
     """
     if web_interface is None:
         return jsonify({"error": "Web interface not initialized"}), 500
-    
+
     stats = web_interface.get_statistics()
-    return jsonify(stats)
+    return json_response(stats)
 
 @app.route('/api/events')
 def api_events():
@@ -69,23 +138,10 @@ def api_events():
     """
     if web_interface is None:
         return jsonify({"error": "Web interface not initialized"}), 500
-    
+
     limit = request.args.get('limit', 20, type=int)
     events = web_interface.get_recent_events(limit)
-    
-    # Convert events to serializable format
-    event_list = []
-    for event in events:
-        event_list.append({
-            'id': event.id,
-            'face_id': event.face_id,
-            'event_type': event.event_type,
-            'timestamp': event.timestamp.isoformat(),
-            'image_path': event.image_path,
-            'confidence': event.confidence
-        })
-    
-    return jsonify(event_list)
+    return json_response(_event_dicts(events))
 
 @app.route('/api/visitor/<face_id>')
 def api_visitor(face_id):
@@ -94,226 +150,85 @@ def api_visitor(face_id):
     """
     if web_interface is None:
         return jsonify({"error": "Web interface not initialized"}), 500
-    
+
     events = web_interface.get_visitor_events(face_id)
-    
-    # Convert events to serializable format
-    event_list = []
-    for event in events:
-        event_list.append({
-            'id': event.id,
-            'face_id': event.face_id,
-            'event_type': event.event_type,
-            'timestamp': event.timestamp.isoformat(),
-            'image_path': event.image_path,
-            'confidence': event.confidence
-        })
-    
-    return jsonify(event_list)
+    return json_response(_event_dicts(events))
+
+def _serialize_event(event):
+    """
+    Serialize one event dict for an SSE data line
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(event).decode()
+    return json.dumps(event)
+
+def _stream_from_pipeline():
+    """
+    SSE generator fed by the in-process pipeline's event callback
+    """
+    client_q = queue.Queue(maxsize=64)
+    with _stream_lock:
+        _stream_clients.add(client_q)
+    try:
+        while True:
+            try:
+                event = client_q.get(timeout=15.0)
+            except queue.Empty:
+                yield ': keep-alive\n\n'  # Holds proxies open when idle
+                continue
+            yield f'data: {_serialize_event(event)}\n\n'
+    finally:
+        with _stream_lock:
+            _stream_clients.discard(client_q)
+
+def _stream_from_database():
+    """
+    SSE generator for the standalone server: no pipeline runs in this
+    process, so poll the shared database for rows newer than the last
+    pushed id and forward only those
+    """
+    last_id = max((row[0] for row in web_interface.get_recent_events(1)), default=0)
+    idle_polls = 0
+    while True:
+        time.sleep(_STREAM_POLL_SECONDS)
+        rows = [row for row in web_interface.get_recent_events(50) if row[0] > last_id]
+        if rows:
+            idle_polls = 0
+            for event in reversed(_event_dicts(rows)):  # oldest first
+                yield f'data: {_serialize_event(event)}\n\n'
+            last_id = max(row[0] for row in rows)
+        else:
+            idle_polls += 1
+            if idle_polls * _STREAM_POLL_SECONDS >= 15.0:
+                idle_polls = 0
+                yield ': keep-alive\n\n'
+
+@app.route('/api/stream')
+def api_stream():
+    """
+    Server-Sent Events stream of entry/exit events. Clients get events
+    pushed as they happen instead of re-running the query every 30s;
+    /api/events remains for the initial page load
+    """
+    generate = _stream_from_pipeline if _pipeline_wired else _stream_from_database
+    return app.response_class(generate(), mimetype='text/event-stream')
 
-def create_web_interface(config):
+def create_web_interface(config, pipeline=None):
     """
     Create and initialize web interface
     Args:
         config: Configuration dictionary
+        pipeline: Optional FacePipeline; when given, its entry/exit
+            events feed the /api/stream SSE endpoint
     """
-    global web_interface
+    global web_interface, _pipeline_wired
     web_interface = WebInterface(config)
-    
-    # Create templates directory if it doesn't exist
-    templates_dir = os.path.join(os.path.dirname(__file__), 'templates')
-    os.makedirs(templates_dir, exist_ok=True)
-    
-    # Create basic HTML template
-    create_html_template(templates_dir)
-    
+    if pipeline is not None:
+        pipeline.on_event(broadcast_event)
+        _pipeline_wired = True
     return app
 
-def create_html_template(templates_dir):
-    """
-    Create basic HTML template for dashboard
-    """
-    template_path = os.path.join(templates_dir, 'dashboard.html')
-    
-    if not os.path.exists(template_path):
-        html_content = """
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Face Tracker Dashboard</title>
-    <style>
-        body {
-            font-family: Arial, sans-serif;
-            margin: 0;
-            padding: 20px;
-            background-color: #f5f5f5;
-        }
-        .container {
-            max-width: 1200px;
-            margin: 0 auto;
-        }
-        .header {
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            padding: 20px;
-            border-radius: 10px;
-            margin-bottom: 20px;
-        }
-        .stats-grid {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-            gap: 20px;
-            margin-bottom: 30px;
-        }
-        .stat-card {
-            background: white;
-            padding: 20px;
-            border-radius: 10px;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-            text-align: center;
-        }
-        .stat-number {
-            font-size: 2em;
-            font-weight: bold;
-            color: #667eea;
-        }
-        .stat-label {
-            color: #666;
-            margin-top: 5px;
-        }
-        .events-section {
-            background: white;
-            padding: 20px;
-            border-radius: 10px;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-        }
-        .event-item {
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            padding: 10px 0;
-            border-bottom: 1px solid #eee;
-        }
-        .event-item:last-child {
-            border-bottom: none;
-        }
-        .event-type {
-            padding: 5px 10px;
-            border-radius: 15px;
-            font-size: 0.8em;
-            font-weight: bold;
-        }
-        .event-entry {
-            background-color: #d4edda;
-            color: #155724;
-        }
-        .event-exit {
-            background-color: #f8d7da;
-            color: #721c24;
-        }
-        .refresh-btn {
-            background: #667eea;
-            color: white;
-            border: none;
-            padding: 10px 20px;
-            border-radius: 5px;
-            cursor: pointer;
-            margin-bottom: 20px;
-        }
-        .refresh-btn:hover {
-            background: #5a6fd8;
-        }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>Intelligent Face Tracker Dashboard</h1>
-            <p>Real-time visitor tracking and analytics</p>
-        </div>
-        
-        <button class="refresh-btn" onclick="refreshData()">Refresh Data</button>
-        
-        <div class="stats-grid">
-            <div class="stat-card">
-                <div class="stat-number" id="total-visitors">-</div>
-                <div class="stat-label">Total Visitors</div>
-            </div>
-            <div class="stat-card">
-                <div class="stat-number" id="total-events">-</div>
-                <div class="stat-label">Total Events</div>
-            </div>
-            <div class="stat-card">
-                <div class="stat-number" id="entry-events">-</div>
-                <div class="stat-label">Entry Events</div>
-            </div>
-            <div class="stat-card">
-                <div class="stat-number" id="exit-events">-</div>
-                <div class="stat-label">Exit Events</div>
-            </div>
-        </div>
-        
-        <div class="events-section">
-            <h2>Recent Events</h2>
-            <div id="events-list">
-                <p>Loading events...</p>
-            </div>
-        </div>
-    </div>
-
-    <script>
-        function refreshData() {
-            // Refresh statistics
-            fetch('/api/stats')
-                .then(response => response.json())
-                .then(data => {
-                    document.getElementById('total-visitors').textContent = data.total_visitors || 0;
-                    document.getElementById('total-events').textContent = data.total_events || 0;
-                    document.getElementById('entry-events').textContent = data.entry_events || 0;
-                    document.getElementById('exit-events').textContent = data.exit_events || 0;
-                })
-                .catch(error => console.error('Error fetching stats:', error));
-            
-            // Refresh events
-            fetch('/api/events?limit=10')
-                .then(response => response.json())
-                .then(data => {
-                    const eventsList = document.getElementById('events-list');
-                    if (data.length === 0) {
-                        eventsList.innerHTML = '<p>No events found</p>';
-                        return;
-                    }
-                    
-                    eventsList.innerHTML = data.map(event => `
-                        <div class="event-item">
-                            <div>
-                                <strong>Face ID:</strong> ${event.face_id.substring(0, 8)}...
-                                <br>
-                                <small>${new Date(event.timestamp).toLocaleString()}</small>
-                            </div>
-                            <span class="event-type event-${event.event_type}">${event.event_type.toUpperCase()}</span>
-                        </div>
-                    `).join('');
-                })
-                .catch(error => console.error('Error fetching events:', error));
-        }
-        
-        // Load data on page load
-        document.addEventListener('DOMContentLoaded', refreshData);
-        
-        // Auto-refresh every 30 seconds
-        setInterval(refreshData, 30000);
-    </script>
-</body>
-</html>
-        """
-        
-        with open(template_path, 'w') as f:
-            f.write(html_content)
-
-def run_web_interface(config, host='0.0.0.0', port=5000, debug=False):
+def run_web_interface(config, host='0.0.0.0', port=5000, debug=False, pipeline=None):
     """
     Run the web interface
     Args:
@@ -321,6 +236,7 @@ def run_web_interface(config, host='0.0.0.0', port=5000, debug=False):
         host: Host address
         port: Port number
         debug: Debug mode
+        pipeline: Optional FacePipeline feeding the event stream
     """
-    app = create_web_interface(config)
-    app.run(host=host, port=port, debug=debug) 
\ No newline at end of file
+    app = create_web_interface(config, pipeline=pipeline)
+    app.run(host=host, port=port, debug=debug, threaded=True)
\ No newline at end of file
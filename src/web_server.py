@@ -4,32 +4,130 @@ Web server for Face Tracker Dashboard
 Run this script to start the web interface independently
 """
 
-import argparse
 import json
 import os
+import pickle
 import sys
-from loguru import logger
-from .web_interface import run_web_interface
-from .logger import setup_logger
+from types import SimpleNamespace
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+def _load_config_cached(path):
+    """
+    Load a JSON config, caching the parsed dict as a pickle next to it.
+    Repeat startups skip JSON tokenization entirely: the cache stores the
+    source file's mtime and regenerates whenever the JSON changes
+    Args:
+        path: Configuration file path
+    Returns:
+        Parsed configuration dictionary
+    """
+    mtime_ns = os.stat(path).st_mtime_ns
+    cache_path = path + '.pkl'
+    try:
+        with open(cache_path, 'rb') as f:
+            cached_mtime, config = pickle.load(f)
+        if cached_mtime == mtime_ns:
+            return config
+    except (OSError, EOFError, pickle.UnpicklingError, ValueError):
+        pass
+
+    # orjson tokenizes noticeably faster than stdlib json and takes the
+    # raw bytes directly; _loads falls back to json.loads without it
+    with open(path, 'rb') as f:
+        config = _loads(f.read())
+
+    # Best-effort cache write, atomic so a crash never leaves a torn file
+    try:
+        tmp_path = cache_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump((mtime_ns, config), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
+    return config
+
+_USAGE = """usage: web_server.py [-h] [--config CONFIG] [--host HOST] [--port PORT]
+                     [--debug] [--log-level LOG_LEVEL]
+
+Face Tracker Web Server
+
+options:
+  -h, --help            show this help message and exit
+  --config CONFIG       Configuration file path
+  --host HOST           Host address
+  --port PORT           Port number
+  --debug               Debug mode
+  --log-level LOG_LEVEL
+                        Logging level
+"""
+
+def _parse_argv(argv):
+    """
+    Parse the server's five fixed flags with a plain argv scan; building
+    an ArgumentParser costs more than the rest of a --help invocation
+    Args:
+        argv: Argument list (sys.argv[1:])
+    Returns:
+        SimpleNamespace with config, host, port, debug, log_level
+    """
+    args = SimpleNamespace(config='config.json', host='0.0.0.0', port=5000,
+                           debug=False, log_level='INFO')
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        if arg in ('-h', '--help'):
+            print(_USAGE, end='')
+            sys.exit(0)
+        elif arg == '--debug':
+            args.debug = True
+        elif arg in ('--config', '--host', '--port', '--log-level'):
+            if i + 1 >= len(argv):
+                print(f"web_server.py: error: argument {arg}: expected one argument",
+                      file=sys.stderr)
+                sys.exit(2)
+            i += 1
+            value = argv[i]
+            if arg == '--config':
+                args.config = value
+            elif arg == '--host':
+                args.host = value
+            elif arg == '--log-level':
+                args.log_level = value
+            else:
+                try:
+                    args.port = int(value)
+                except ValueError:
+                    print(f"web_server.py: error: argument --port: invalid int value: '{value}'",
+                          file=sys.stderr)
+                    sys.exit(2)
+        else:
+            print(f"web_server.py: error: unrecognized argument: {arg}", file=sys.stderr)
+            sys.exit(2)
+        i += 1
+    return args
 
 def main():
     """
     Main entry point for web server
     """
-    parser = argparse.ArgumentParser(description='Face Tracker Web Server')
-    parser.add_argument('--config', default='config.json', help='Configuration file path')
-    parser.add_argument('--host', default='0.0.0.0', help='Host address')
-    parser.add_argument('--port', default=5000, type=int, help='Port number')
-    parser.add_argument('--debug', action='store_true', help='Debug mode')
-    parser.add_argument('--log-level', default='INFO', help='Logging level')
-    
-    args = parser.parse_args()
-    
+    args = _parse_argv(sys.argv[1:])
+
+    # Imported only after argument parsing: loguru and the web interface
+    # (which pulls in Flask and the database stack) are too heavy for
+    # --help and bad-argument paths to pay for
+    from loguru import logger
+    from .web_interface import run_web_interface
+    from .logger import setup_logger
+
     try:
         # Load configuration
-        with open(args.config, 'r') as f:
-            config = json.load(f)
-        
+        config = _load_config_cached(args.config)
+
         # Setup logging
         setup_logger(config['log_dir'], args.log_level)
         